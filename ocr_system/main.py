@@ -1,13 +1,62 @@
 import os
 import io
+import copy
+import zlib
+import random
+import shutil
 import zipfile
+import weakref
 import tempfile
-import pdfplumber
+import numpy as np
+import pymupdf
 from enum import Enum
-from typing import List, Optional, Iterable
-from dataclasses import dataclass, field
+from collections import OrderedDict
+from itertools import chain
+from operator import itemgetter
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from typing import Dict, List, Optional, Iterable, Iterator, Tuple
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 
+try:
+    # Optional: ISA-L hardware-accelerated CRC32 (pip install isal)
+    from isal import isal_zlib
+except ImportError:
+    isal_zlib = None
+
+# ISA-L gives results identical to zlib's crc32, only faster
+_crc32 = isal_zlib.crc32 if isal_zlib is not None else zlib.crc32
+
+try:
+    # Optional: forward-only ZIP reader for TextExtractor(stream_zip=True) (pip install stream-unzip)
+    from stream_unzip import stream_unzip, UnzipError
+except ImportError:
+    stream_unzip = None
+    UnzipError = None
+
+if isal_zlib is not None:
+    class _IsalZipExtFile(zipfile.ZipExtFile):
+        # Same as ZipExtFile._update_crc, with ISA-L computing the running CRC
+        def _update_crc(self, newdata):
+            if self._expected_crc is None:
+                return
+            self._running_crc = isal_zlib.crc32(newdata, self._running_crc)
+            if self._eof and self._running_crc != self._expected_crc:
+                raise zipfile.BadZipFile("Bad CRC-32 for file %r" % self.name)
+
+    class _ZipFile(zipfile.ZipFile):
+        """
+        ZipFile whose member reads verify CRCs with ISA-L. Scoped to the archives opened here,
+        so zipfile.crc32 (and any writer in the process) is left untouched.
+        """
+        def open(self, name, mode="r", pwd=None, *, force_zip64=False):
+            fh = super().open(name, mode, pwd, force_zip64=force_zip64)
+            if mode == "r":
+                fh.__class__ = _IsalZipExtFile
+            return fh
+else:
+    _ZipFile = zipfile.ZipFile
+
 # ---------- Types ----------
 
 class Extensions(Enum):
@@ -20,38 +69,50 @@ class ExtractData:
     warning: List[str] = field(default_factory=list)
     error: List[str] = field(default_factory=list)
 
-@dataclass
+@dataclass(slots=True)
 class ZipMember:
     # Basic meta
     name: str
     size: int
-    compress_size: int
-    modified: datetime
+    compress_size: Optional[int]         # None when streamed (stream_zip=True)
+    date_time: Optional[tuple]           # raw ZipInfo.date_time; see .modified. None when streamed
     crc: int
 
     # Integrity & diagnostics
     crc_ok: bool = False
     error: Optional[str] = None
 
-    # Always use a temp file (seekable path for downstream tools)
+    # Member content: a temp file (seekable path for downstream tools) when
+    # TextExtractor.use_tempfile is set, otherwise the decompressed bytes in memory
     temp_path: Optional[str] = None
+    data: Optional[bytes] = None
 
+    # Unverified members (verify_crc=False) are read from the archive on demand; the ZipInfo
+    # pins the exact entry (names can repeat) and lets the reader skip the name lookup
+    zip_path: Optional[str] = None
+    zip_info: Optional[zipfile.ZipInfo] = field(default=None, repr=False)
 
-@dataclass
+    @property
+    def modified(self) -> Optional[datetime]:
+        # Built on access; most callers never look at it
+        return datetime(*self.date_time) if self.date_time else None
+
+
+@dataclass(slots=True)
 class PdfPageStats:
     index: int
     width: float
     height: float
     image_area_ratio: float              # 0..1 of page area covered by images
-    text_chars: int                      # len(page.chars)
-    text_words: int                      # len(page.extract_words())
+    text_chars: int                      # non-whitespace chars of page.get_text(), from the pre-check pass
+    text_words: int                      # len(page.get_text("words"))
     text_area_ratio: float               # sum of word boxes area / page area
     has_text: bool
     has_images: bool
     image_dominant: bool                 # image_area_ratio >= IMG_RATIO_SCANNED
     text_dominant: bool                  # text_area_ratio >= TEXT_AREA_MIN_RATIO and not image_dominant
 
-@dataclass
+@dataclass(slots=True)
 class PdfLayoutProfile:
     file_name: Optional[str]
     readable: bool
@@ -63,14 +124,23 @@ class PdfLayoutProfile:
     pages_image_dominant: int = 0
     pages_text_dominant: int = 0
     pages_mixed: int = 0
+    # True when the scan stopped early: the counts above then come from a prefix of the
+    # sample (biased toward the start of the document); the recommendation is still settled
+    counts_partial: bool = False
 
     # Recommendation for processing
     recommended: str = "hybrid"          # one of: 'ocr', 'pdfplumber', 'hybrid'
     rationale: str = ""
 
-    # Per-page details (optional for logging/QA)
+    # Per-page details (optional for logging/QA; filled only with keep_page_stats=True).
+    # Every page for 'hybrid' or exhaustive profiles, otherwise the pages scanned
     page_stats: List[PdfPageStats] = field(default_factory=list)
 
+    # PNG renders of OCR-bound pages by page index (only with render_pages=True)
+    rendered_pages: Dict[int, bytes] = field(default_factory=dict, repr=False)
+    # OCR-bound pages left unrendered once RENDER_PAGE_LIMIT was reached
+    unrendered_pages: List[int] = field(default_factory=list)
+
 
 @dataclass
 class ZipData:
@@ -86,28 +156,99 @@ class ZipData:
 
 
 # ---------- Extractor ----------
+_STREAM_NO_VERIFY_ERROR = "verify_crc=False is not supported with stream_zip=True."
+
 # Page is considered "scanned/image-based" if image coverage dominates
 IMG_RATIO_SCANNED = 0.75       # ≥75% of page area is image
 
 # Minimal text criteria (to guard against stamps/single words)
-CHAR_MIN_FOR_TEXT = 50         # at least 50 glyphs
+CHAR_MIN_FOR_TEXT = 50         # at least 50 non-whitespace chars
 TEXT_AREA_MIN_RATIO = 0.02     # ≥2% of page area covered by word boxes
 
+# Share of pages needed to route a whole PDF to OCR / pdfplumber
+OCR_PAGE_FRACTION = 0.60
+TEXT_PAGE_FRACTION = 0.90
+
+# Pages inspected per PDF unless an exhaustive profile is requested
+SAMPLE_PAGES = 8
+
+# Chunk size when streaming ZIP members to temp files
+COPY_BUFFER_SIZE = 4 * 1024 * 1024
+
+# Scale for page renders handed to OCR (2 = 144 dpi)
+RENDER_ZOOM = 2
+
+# Most pages rendered per PDF; the rest are listed in PdfLayoutProfile.unrendered_pages
+RENDER_PAGE_LIMIT = 32
+
+# Members decompressed ahead of the profiling workers
+PROFILE_QUEUE_DEPTH = 4
+
+# Largest member kept in memory when use_tempfile is off; bigger ones go to a temp file
+MAX_IN_MEMORY_MEMBER = 64 * 1024 * 1024
+
+# Profiles kept per extractor for duplicate PDFs (least recently used evicted first)
+PROFILE_CACHE_SIZE = 1024
+
 class TextExtractor:
-    def __init__(self, extensions: Optional[Iterable[Extensions]] = None, temp_dir: Optional[str] = None):
+    def __init__(self, extensions: Optional[Iterable[Extensions]] = None, temp_dir: Optional[str] = None,
+                 max_workers: Optional[int] = None, use_tempfile: bool = False, max_temp_pool: int = 0,
+                 stream_zip: bool = False, render_pages: bool = False, keep_page_stats: bool = False,
+                 exhaustive: bool = False):
         """
         temp_dir: where to place temp files; defaults to system temp if None.
+        max_workers: processes used to profile PDFs; defaults to os.cpu_count() if None.
+        use_tempfile: write ZIP members to temp files instead of keeping them in memory
+                      (members over MAX_IN_MEMORY_MEMBER, or of unknown size, always go to temp files).
+        max_temp_pool: temp files kept (truncated) for reuse after cleanup instead of being deleted (0 disables);
+                       pooled files are removed by close() / leaving a `with` block, or when the extractor
+                       is garbage-collected.
+        stream_zip: read ZIPs front to back with stream-unzip instead of loading the central directory.
+        render_pages: render OCR-bound pages to PNG while profiling (PdfLayoutProfile.rendered_pages).
+        keep_page_stats: keep per-page stats on profiles (PdfLayoutProfile.page_stats); 'hybrid' profiles then
+                         cover every page, for per-page routing.
+        exhaustive: profile every page instead of a SAMPLE_PAGES sample.
         """
-        self.valid_extensions = {e.value.lower() for e in (extensions or {Extensions.PDF})}
+        if stream_zip and stream_unzip is None:
+            raise ImportError("stream_zip=True requires the stream-unzip package")
+
+        self.valid_extensions = frozenset(e.value.lower() for e in (extensions or {Extensions.PDF}))
         self.zip_password: Optional[bytes] = None
         self.temp_dir = temp_dir
+        self.max_workers = max_workers or os.cpu_count()
+        self.use_tempfile = use_tempfile
+        self.max_temp_pool = max_temp_pool
+        self._temp_pool: Dict[str, List[str]] = {}  # suffix -> reusable temp file paths
+        # Pooled files are deleted even if close() is never called (also runs at interpreter exit)
+        weakref.finalize(self, _delete_temp_pool, self._temp_pool)
+        self.stream_zip = stream_zip
+        self.render_pages = render_pages
+        self.keep_page_stats = keep_page_stats
+        self.exhaustive = exhaustive
+        self._profile_cache: "OrderedDict[Tuple[int, int], PdfLayoutProfile]" = OrderedDict()  # (crc32, size) -> profile
+
+    def __enter__(self) -> "TextExtractor":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Releases resources held between calls (the temp file pool).
+        """
+        self.clear_temp_pool()
 
     def set_zip_password(self, zip_password):
         if isinstance(zip_password, str):
             zip_password = zip_password.encode('utf-8')
         self.zip_password = zip_password
 
-    def extract(self, file_path: str) -> ExtractData:
+    def extract(self, file_path: str, verify_crc: bool = True) -> ExtractData:
+        """
+        verify_crc: passed to iter_zip_members; False defers reading ZIP members to the profiling workers
+                    (not available with stream_zip=True, reported in ExtractData.error).
+        """
         zip_data = ZipData()
         try:
             extract_data = ExtractData()
@@ -119,16 +260,20 @@ class TextExtractor:
             extension = self._get_extension(file_path)
 
             if extension == '.zip':
-                zip_data = self.get_zip_members(file_path)
+                if self.stream_zip and not verify_crc:
+                    extract_data.error.append(_STREAM_NO_VERIFY_ERROR)
+                    return extract_data
+
+                # Members are profiled while later ones are still being decompressed.
                 # Example: act on ok members (call pdfplumber or OCR)
-                for zip_member in zip_data.ok_members:
-                    prof = self._profile_pdf_layout(path=zip_member.temp_path, original_name=zip_member.name)
+                members = self.iter_zip_members(file_path, zip_data, verify_crc=verify_crc)
+                for prof in self._profile_members(members):
                     print(prof)
                     # Route based on prof.recommended:
                     #   'pdfplumber' -> extract text directly
                     #   'ocr'        -> run OCR
                     #   'hybrid'     -> per-page: OCR pages where s.image_dominant else pdfplumber
-                    # if prof.recommended == "hybrid":
+                    # if prof.recommended == "hybrid":  (needs TextExtractor(keep_page_stats=True))
                     #     image_pages = [s.index for s in prof.page_stats if s.image_dominant]
                     #     text_pages = [s.index for s in prof.page_stats if s.text_dominant]
                         # OCR image_pages; pdfplumber text_pages
@@ -154,68 +299,92 @@ class TextExtractor:
     def _is_valid_member(self, name: str) -> bool:
         return self._get_extension(name) in self.valid_extensions
 
-    def get_zip_members(self, zip_path: str) -> ZipData:
+    def get_zip_members(self, zip_path: str, verify_crc: bool = True) -> ZipData:
         """
-        Streams each valid member to a temp file (always).
+        Reads each valid member into memory (member.data), or streams it to a temp file when use_tempfile is set
+        or the member is larger than MAX_IN_MEMORY_MEMBER.
         - CRC/encryption issues -> member marked bad; any partial temp file is removed.
-        - On success, member.temp_path points to a seekable file for downstream tools.
+        - On success, member.data holds the bytes, or member.temp_path points to a seekable file.
+        - verify_crc=False skips reading altogether: members only carry zip_path/zip_info and are read on demand
+          (read_member / profiling), where a corrupt member surfaces as a read or parse error.
         """
         zd = ZipData()
+        for _ in self.iter_zip_members(zip_path, zd, verify_crc=verify_crc):
+            pass
+        return zd
+
+    def iter_zip_members(self, zip_path: str, zd: ZipData, verify_crc: bool = True) -> Iterator[ZipMember]:
+        """
+        Generator form of get_zip_members: yields each ok member as soon as it has been fully read.
+        Ok/bad members, errors and counts are recorded on `zd` as the archive is walked.
+        stream_zip=True with verify_crc=False records an error and yields nothing: streamed members are
+        always read (and so verified) in full, and can't be re-read from the archive later.
+        """
+        if self.stream_zip:
+            if not verify_crc:
+                zd.errors.append(_STREAM_NO_VERIFY_ERROR)
+                return
+            yield from self._iter_streamed_zip_members(zip_path, zd)
+            return
+
         try:
-            with zipfile.ZipFile(zip_path, "r") as zf:
+            with _ZipFile(zip_path, "r") as zf:
                 if self.zip_password:
                     zf.setpassword(self.zip_password)
 
-                entries = [i for i in zf.infolist() if not i.is_dir()]
-                if not entries:
-                    return zd
+                # Hot-loop lookups bound to locals
+                valid_extensions = self.valid_extensions
+                get_ext = self._get_extension
+                ok_append = zd.ok_members.append
+                ok_name_append = zd.ok_files.append
 
-                candidates = [i for i in entries if self._is_valid_member(i.filename)]
-                if not candidates:
-                    return zd  # nothing to process; not an error
+                # Single lazy pass over the entries; no candidates is nothing to process, not an error.
+                # Extension computed once per entry; reused as the temp file suffix
+                candidates = ((i, ext) for i in zf.infolist()
+                              if not i.is_dir() and (ext := get_ext(i.filename)) in valid_extensions)
 
-                for info in candidates:
+                for info, ext in candidates:
                     member = ZipMember(
                         name=info.filename,
                         size=info.file_size,
                         compress_size=info.compress_size,
-                        modified=datetime(*info.date_time),
+                        date_time=info.date_time,
                         crc=info.CRC
                     )
 
+                    if not verify_crc:
+                        member.zip_path = zip_path
+                        member.zip_info = info
+                        ok_append(member)
+                        ok_name_append(member.name)
+                        yield member
+                        continue
+
                     tmp_path = None
                     try:
-                        # Read+write in chunks; reading entire stream triggers CRC verification.
-                        with zf.open(info, "r") as fh:
-                            suffix = self._get_extension(info.filename) or ".bin"
-                            with tempfile.NamedTemporaryFile(delete=False, dir=self.temp_dir, suffix=suffix) as tmp:
-                                tmp_path = tmp.name
-                                for chunk in iter(lambda: fh.read(1024 * 1024), b""):
-                                    tmp.write(chunk)
+                        if not self.use_tempfile and info.file_size <= MAX_IN_MEMORY_MEMBER:
+                            # Reading the entire member triggers CRC verification.
+                            member.data = zf.read(info)
+                        else:
+                            # Copy in large chunks; reading entire stream triggers CRC verification.
+                            # Unbuffered temp file: copyfileobj already hands over large contiguous buffers.
+                            with zf.open(info, "r") as fh:
+                                tmp_path, tmp = self._open_temp_file(ext or ".bin")
+                                with tmp:
+                                    shutil.copyfileobj(fh, tmp, length=COPY_BUFFER_SIZE)
 
                         # If we reached here, full read succeeded -> CRC OK.
                         member.crc_ok = True
                         member.temp_path = tmp_path
-                        zd.ok_members.append(member)
-                        zd.ok_files.append(member.name)
+                        ok_append(member)
+                        ok_name_append(member.name)
+                        yield member
 
                     except (zipfile.BadZipFile, RuntimeError, OSError, ValueError) as e:
-                        member.error = str(e)
-                        zd.bad_members.append(member)
-                        zd.bad_files.append(member.name)
-
-                        # Encrypted/wrong password is a common RuntimeError case
-                        if "password" in str(e).lower() or "decrypt" in str(e).lower():
-                            zd.errors.append(f"{member.name}: Encrypted entry (wrong/missing password).")
-                        else:
-                            zd.errors.append(f"{member.name}: {e}")
+                        self._add_bad_member(zd, member, e)
 
-                        # Remove any partial temp file
-                        if tmp_path and os.path.exists(tmp_path):
-                            try:
-                                os.remove(tmp_path)
-                            except Exception:
-                                pass
+                        # Drop any partial temp file
+                        self._release_temp_file(tmp_path)
 
         except zipfile.BadZipFile:
             zd.errors.append("Not a ZIP file or file is severely corrupted.")
@@ -223,140 +392,569 @@ class TextExtractor:
             zd.errors.append(f"ZIP too large or ZIP64 issue: {e}")
         except Exception as e:
             zd.errors.append(f"Unexpected error: {e}")
+        finally:
+            zd.ok_files_count = len(zd.ok_files)
+            zd.bad_files_count = len(zd.bad_files)
 
-        zd.ok_files_count = len(zd.ok_files)
-        zd.bad_files_count = len(zd.bad_files)
-        return zd
+    def _iter_streamed_zip_members(self, zip_path: str, zd: ZipData) -> Iterator[ZipMember]:
+        """
+        iter_zip_members backend for stream_zip=True: walks local file headers front to back with stream-unzip,
+        so the central directory is never loaded and the first member is available right away.
+        - Members are always CRC-verified; compress_size/date_time are not known.
+        - A broken entry ends the walk, since a forward-only stream cannot skip past it. A broken member
+          is recorded as bad; a broken non-member entry (e.g. an encrypted .txt) only adds to zd.errors.
+          Either way the entries after it are not reported, unlike with the zipfile backend.
+        """
+        valid_extensions = self.valid_extensions
+        get_ext = self._get_extension
+        # Without a password stream-unzip fails on an encrypted entry's header, before its name is
+        # known; an empty one defers that to reading the entry, as a wrong password does
+        password = self.zip_password or b""
+        try:
+            with open(zip_path, "rb") as fh:
+                zip_chunks = iter(lambda: fh.read(COPY_BUFFER_SIZE), b"")
+                for raw_name, size, chunks in stream_unzip(zip_chunks, password=password):
+                    name = _decode_zip_name(raw_name)
+                    ext = get_ext(name)
+                    if name.endswith("/") or ext not in valid_extensions:
+                        try:
+                            for _ in chunks:  # must be drained before the next member
+                                pass
+                        except UnzipError as e:
+                            zd.errors.append(f"{_zip_error_message(name, e)} Stopped reading the archive.")
+                            return
+                        continue
+
+                    member = ZipMember(name=name, size=size, compress_size=None, date_time=None, crc=0)
+                    tmp_path = None
+                    crc = written = 0
+                    try:
+                        # Size is None when the header defers it to a data descriptor
+                        if not self.use_tempfile and size is not None and size <= MAX_IN_MEMORY_MEMBER:
+                            member.data = b"".join(chunks)
+                            crc, written = _crc32(member.data), len(member.data)
+                        else:
+                            tmp_path, tmp = self._open_temp_file(ext or ".bin")
+                            with tmp:
+                                for chunk in chunks:
+                                    crc = _crc32(chunk, crc)
+                                    written += tmp.write(chunk)
+                    except (UnzipError, OSError) as e:
+                        member.data = None
+                        self._add_bad_member(zd, member, e)
+                        self._release_temp_file(tmp_path)
+                        return
+
+                    # stream-unzip raises on a CRC mismatch, so reaching here means CRC OK.
+                    # Header size can be missing when the member uses a data descriptor
+                    member.size = written
+                    member.crc = crc
+                    member.crc_ok = True
+                    member.temp_path = tmp_path
+                    zd.ok_members.append(member)
+                    zd.ok_files.append(member.name)
+                    yield member
+
+        except UnzipError as e:
+            zd.errors.append(f"Not a ZIP file or file is severely corrupted ({type(e).__name__}).")
+        except Exception as e:
+            zd.errors.append(f"Unexpected error: {e}")
+        finally:
+            zd.ok_files_count = len(zd.ok_files)
+            zd.bad_files_count = len(zd.bad_files)
+
+    def _add_bad_member(self, zd: ZipData, member: ZipMember, e: Exception) -> None:
+        member.error = str(e) or type(e).__name__
+        zd.bad_members.append(member)
+        zd.bad_files.append(member.name)
+        zd.errors.append(_zip_error_message(member.name, e))
 
     def cleanup_zip_members(self, zip_data: ZipData) -> None:
         """
-        Delete all temp files created for members (ok and bad).
+        Release all temp files created for members (ok and bad) and drop in-memory member data.
+        Temp files go back to the reuse pool while it has room and are deleted otherwise.
         Call after you're done with pdfplumber/OCR.
         """
         for m in zip_data.ok_members + zip_data.bad_members:
-            if m.temp_path and os.path.exists(m.temp_path):
-                try:
-                    os.remove(m.temp_path)
-                except Exception:
-                    # Intentionally swallow; you may want to log this
-                    pass
-
-    def _profile_pdf_layout(self, path: Optional[str], original_name: Optional[str] = None) -> PdfLayoutProfile:
+            m.data = None
+            self._release_temp_file(m.temp_path)
+            m.temp_path = None
+
+    def clear_temp_pool(self) -> None:
         """
-        Classifies a PDF by page:
-          - image_area_ratio (0..1)
-          - text density (chars, words, text_area_ratio)
-        And recommends: 'ocr' | 'pdfplumber' | 'hybrid'
+        Delete pooled temp files kept for reuse.
+        """
+        _delete_temp_pool(self._temp_pool)
 
-        Relies on pdfplumber. Returns PdfLayoutProfile with per-page stats.
+    def _open_temp_file(self, suffix: str):
+        """
+        Opens an unbuffered temp file for writing, reusing a pooled one when available.
+        Returns (path, file object); a pooled file is truncated on open.
+        """
+        pool = self._temp_pool.get(suffix)
+        while pool:
+            path = pool.pop()
+            try:
+                return path, open(path, "wb", buffering=0)
+            except OSError:
+                pass  # pooled file disappeared (e.g. temp dir cleaned); try the next one
+
+        fd, path = tempfile.mkstemp(suffix=suffix, dir=self.temp_dir)
+        return path, open(fd, "wb", buffering=0)
+
+    def _release_temp_file(self, path: Optional[str]) -> None:
+        """
+        Returns a temp file to the reuse pool, or deletes it when the pool is full.
+        Pooled files are truncated first, so decrypted member content never outlives its member.
         """
-        name = original_name or (os.path.basename(path) if path else None)
         if not path:
-            return PdfLayoutProfile(file_name=name, readable=False, pages=0, error="no input provided")
+            return
 
-        try:
-            with pdfplumber.open(path) as pdf:
-                meta = getattr(pdf, "metadata", {}) or {}
-                n_pages = len(pdf.pages)
-                profile = PdfLayoutProfile(file_name=name, readable=True, pages=n_pages, metadata=meta)
-
-                for idx, pg in enumerate(pdf.pages):
-                    W, H = float(pg.width), float(pg.height)
-                    page_area = max(W * H, 1.0)
-
-                    # ----- image area ratio -----
-                    imgs = getattr(pg, "images", []) or []
-                    img_area = 0.0
-                    for im in imgs:
-                        # pdfplumber images have x0, y0, x1, y1
-                        x0, x1 = float(im.get("x0", 0)), float(im.get("x1", 0))
-                        y0, y1 = float(im.get("y0", 0)), float(im.get("y1", 0))
-                        w = max(x1 - x0, 0.0)
-                        h = max(y1 - y0, 0.0)
-                        img_area += (w * h)
-                    image_area_ratio = min(img_area / page_area, 1.0)
-
-                    # ----- text density -----
-                    # glyph-level count
-                    chars = getattr(pg, "chars", []) or []
-                    text_chars = len(chars)
-
-                    # word boxes (sum area to approximate text coverage)
-                    try:
-                        words = pg.extract_words() or []
-                    except Exception:
-                        words = []
-                    word_area = 0.0
-                    for wdict in words:
-                        x0, x1 = float(wdict.get("x0", 0)), float(wdict.get("x1", 0))
-                        top = float(wdict.get("top", 0))
-                        bottom = float(wdict.get("bottom", top))
-                        w = max(x1 - x0, 0.0)
-                        h = max(bottom - top, 0.0)
-                        word_area += (w * h)
-                    text_area_ratio = min(word_area / page_area, 1.0)
-
-                    has_images = image_area_ratio > 0.0
-                    has_text = (text_chars >= CHAR_MIN_FOR_TEXT) or (text_area_ratio >= TEXT_AREA_MIN_RATIO)
-
-                    image_dominant = image_area_ratio >= IMG_RATIO_SCANNED
-                    text_dominant = (text_area_ratio >= TEXT_AREA_MIN_RATIO and not image_dominant)
-
-                    profile.page_stats.append(
-                        PdfPageStats(
-                            index=idx,
-                            width=W,
-                            height=H,
-                            image_area_ratio=image_area_ratio,
-                            text_chars=text_chars,
-                            text_words=len(words),
-                            text_area_ratio=text_area_ratio,
-                            has_text=has_text,
-                            has_images=has_images,
-                            image_dominant=image_dominant,
-                            text_dominant=text_dominant,
-                        )
-                    )
+        if sum(map(len, self._temp_pool.values())) < self.max_temp_pool:
+            try:
+                os.truncate(path, 0)
+                self._temp_pool.setdefault(os.path.splitext(path)[1], []).append(path)
+                return
+            except OSError:
+                pass  # can't empty it; fall through and delete it instead
 
-                # ----- aggregates & recommendation -----
-                img_dom = sum(1 for s in profile.page_stats if s.image_dominant)
-                txt_dom = sum(1 for s in profile.page_stats if s.text_dominant)
-                mixed = n_pages - (img_dom + txt_dom)
-
-                profile.pages_image_dominant = img_dom
-                profile.pages_text_dominant = txt_dom
-                profile.pages_mixed = mixed
-
-                # Recommend pipeline:
-                # - If most pages are image-dominant -> OCR
-                # - If most pages are text-dominant  -> pdfplumber
-                # - Otherwise                        -> hybrid (OCR image-dominant pages; parse text pages)
-                if n_pages > 0:
-                    frac_img = img_dom / n_pages
-                    frac_txt = txt_dom / n_pages
-
-                    if frac_img >= 0.60:
-                        profile.recommended = "ocr"
-                        profile.rationale = f"{img_dom}/{n_pages} pages are image-dominant (≥{int(IMG_RATIO_SCANNED * 100)}% image area)."
-                    elif frac_txt >= 0.90:
-                        profile.recommended = "pdfplumber"
-                        profile.rationale = f"{txt_dom}/{n_pages} pages have sufficient text density."
-                    else:
-                        profile.recommended = "hybrid"
-                        profile.rationale = (
-                            f"Mixed content: image-dominant={img_dom}, text-dominant={txt_dom}, mixed={mixed}."
-                        )
-
-                # Extra hint: if Producer indicates scanner, bias toward OCR if not already
-                producer = (profile.metadata.get("Producer") or "").lower()
-                if "scan" in producer and profile.recommended == "pdfplumber":
-                    profile.recommended = "hybrid"
-                    profile.rationale += " Producer suggests a scanner; using hybrid for safety."
-
-                return profile
+        try:
+            os.unlink(path)
+        except OSError:
+            # Missing file; intentionally swallow, you may want to log this
+            pass
 
-        except Exception as e:
-            return PdfLayoutProfile(file_name=name, readable=False, pages=0, error=str(e))
+    def read_member(self, member: ZipMember) -> bytes:
+        """
+        Returns member content from memory, its temp file, or (unverified members) the archive itself.
+        """
+        if member.data is not None:
+            return member.data
+        if member.temp_path:
+            with open(member.temp_path, "rb") as fh:
+                return fh.read()
+        if member.zip_path:
+            with _ZipFile(member.zip_path, "r") as zf:
+                return _read_zip_member(zf, member, self.zip_password)
+        raise ValueError(f"{member.name}: no content available")
+
+    def _profile_members(self, members: Iterable[ZipMember]) -> Iterator[PdfLayoutProfile]:
+        """
+        Profiles members in parallel (one PDF per worker process) while `members` is still being produced.
+        At most max_workers + PROFILE_QUEUE_DEPTH profiles are in flight; once that fills up, the producer
+        waits for a worker instead of decompressing the rest of the archive ahead of time.
+        CRC-verified members already profiled under the same (crc, size), in this or an earlier archive,
+        are served from the profile cache without touching a worker; a duplicate of a member still being
+        profiled waits for that result instead of being submitted again.
+        In-memory members have member.data dropped once their profile is available, so at most the
+        in-flight window is held in RAM; temp files stay until cleanup_zip_members.
+        Yields profiles in completion order, not input order.
+        """
+        with ProcessPoolExecutor(max_workers=self.max_workers) as ex:
+            pending = {}      # future -> (cache key, member)
+            in_flight = {}    # cache key -> future
+            followers = {}    # future -> duplicate members waiting on it
+
+            def finish(fut):
+                key, member = pending.pop(fut)
+                in_flight.pop(key, None)
+                profile = self._finish_profile(key, member, fut.result())
+                yield profile
+                for dup in followers.pop(fut, ()):
+                    yield _copy_profile(profile, dup.name)
+
+            for m in members:
+                # An unverified member's CRC comes from the central directory, not its bytes
+                key = (m.crc, m.size) if m.crc_ok else None
+                cached = self._get_cached_profile(key, m.name)
+                if cached is not None:
+                    m.data = None
+                    yield cached
+                    continue
+                if key in in_flight:
+                    m.data = None
+                    followers.setdefault(in_flight[key], []).append(m)
+                    continue
+
+                fut = ex.submit(_profile_zip_member, m, self.zip_password,
+                                self.exhaustive, self.keep_page_stats, self.render_pages)
+                pending[fut] = (key, m)
+                if key is not None:
+                    in_flight[key] = fut
+                if len(pending) >= self.max_workers + PROFILE_QUEUE_DEPTH:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        yield from finish(fut)
+
+            for fut in as_completed(list(pending)):
+                yield from finish(fut)
+
+    def _finish_profile(self, key: Optional[Tuple[int, int]], member: ZipMember,
+                        profile: PdfLayoutProfile) -> PdfLayoutProfile:
+        # The bytes were pickled to the worker at submit; nothing needs them once the result is back
+        member.data = None
+        return self._cache_profile(key, profile)
+
+    def _get_cached_profile(self, key: Optional[Tuple[int, int]], file_name: Optional[str]) -> Optional[PdfLayoutProfile]:
+        """
+        Independent copy of the cached profile for `key` under `file_name`, or None on a miss.
+        Renders are not cached, so with render_pages an OCR-bound profile counts as a miss.
+        """
+        cached = self._profile_cache.get(key) if key is not None else None
+        if cached is None or (self.render_pages and cached.recommended in ("ocr", "hybrid")):
+            return None
+        self._profile_cache.move_to_end(key)
+        return _copy_profile(cached, file_name)
+
+    def _cache_profile(self, key: Optional[Tuple[int, int]], profile: PdfLayoutProfile) -> PdfLayoutProfile:
+        # Unreadable results may come from a corrupt copy; don't let them shadow a good one
+        if key is not None and profile.readable:
+            self._profile_cache[key] = _copy_profile(replace(profile, rendered_pages={}), profile.file_name)
+            self._profile_cache.move_to_end(key)
+            if len(self._profile_cache) > PROFILE_CACHE_SIZE:
+                self._profile_cache.popitem(last=False)
+        return profile
+
+
+# ---------- Layout profiling ----------
+# Module-level so it can be pickled into worker processes.
+
+def _delete_temp_pool(pool: Dict[str, List[str]]) -> None:
+    # Module-level so weakref.finalize doesn't keep the extractor alive
+    for paths in pool.values():
+        for path in paths:
+            try:
+                os.unlink(path)
+            except OSError:
+                # Intentionally swallow; you may want to log this
+                pass
+    pool.clear()
+
+
+def _copy_profile(profile: PdfLayoutProfile, file_name: Optional[str]) -> PdfLayoutProfile:
+    # Deep copy: metadata, page_stats and rendered_pages must not be shared between results
+    profile = copy.deepcopy(profile)
+    profile.file_name = file_name
+    return profile
+
+
+def _zip_error_message(name: str, e: Exception) -> str:
+    # stream-unzip errors often carry no message; fall back to the exception name
+    msg = str(e) or type(e).__name__
+
+    # Encrypted/wrong password is a common RuntimeError case
+    if "password" in msg.lower() or "decrypt" in msg.lower():
+        return f"{name}: Encrypted entry (wrong/missing password)."
+    return f"{name}: {msg}"
+
+
+def _decode_zip_name(raw_name: bytes) -> str:
+    # Streamed headers come without zipfile's UTF-8 flag handling; fall back to cp437 like zipfile does
+    try:
+        return raw_name.decode("utf-8")
+    except UnicodeDecodeError:
+        return raw_name.decode("cp437")
+
+
+def _read_zip_member(zf: zipfile.ZipFile, member: ZipMember, zip_password: Optional[bytes] = None) -> bytes:
+    # Full read verifies the CRC; reading by ZipInfo picks the right entry when names repeat
+    return zf.read(member.zip_info or member.name, pwd=zip_password)
+
+
+# Archive kept open by a worker process across the unverified members it profiles,
+# so the central directory is parsed once per worker rather than once per member
+_worker_zip: Optional[zipfile.ZipFile] = None
+
+
+def _worker_zip_file(zip_path: str) -> zipfile.ZipFile:
+    global _worker_zip
+    if _worker_zip is None or _worker_zip.filename != zip_path:
+        if _worker_zip is not None:
+            _worker_zip.close()
+        _worker_zip = None
+        _worker_zip = _ZipFile(zip_path, "r")
+    return _worker_zip
+
+
+def _sum_bbox_areas(boxes: Iterable[Iterable[float]], count: int) -> float:
+    """
+    Total area of `count` (x0, y0, x1, y1) boxes, summed with NumPy; inverted boxes count as zero.
+    """
+    if not count:
+        return 0.0
+    coords = np.fromiter(chain.from_iterable(boxes), dtype=np.float64, count=4 * count).reshape(-1, 4)
+    w = np.maximum(coords[:, 2] - coords[:, 0], 0.0)
+    h = np.maximum(coords[:, 3] - coords[:, 1], 0.0)
+    return float((w * h).sum())
+
+
+def _profile_zip_member(member: ZipMember, zip_password: Optional[bytes] = None, exhaustive: bool = False,
+                        keep_page_stats: bool = False, render_pages: bool = False) -> PdfLayoutProfile:
+    """
+    Worker entry point: profiles a member from its temp file, its bytes, or (unverified members) the archive.
+    """
+    data = member.data
+    if not member.temp_path and data is None and member.zip_path:
+        try:
+            data = _read_zip_member(_worker_zip_file(member.zip_path), member, zip_password)
+        except (zipfile.BadZipFile, RuntimeError, OSError, ValueError) as e:
+            return PdfLayoutProfile(file_name=member.name, readable=False, pages=0, error=str(e))
+
+    return _profile_pdf_layout(member.temp_path, member.name, exhaustive=exhaustive, data=data,
+                               keep_page_stats=keep_page_stats, render_pages=render_pages)
+
+
+# (x0, y0, x1, y1) accessors; PyMuPDF always fills these, so no .get() fallbacks
+_IMAGE_BBOX = itemgetter("bbox")         # page.get_image_info() dicts
+_WORD_BBOX = itemgetter(0, 1, 2, 3)      # page.get_text("words") tuples
+
+
+def _sample_page_indices(n_pages: int) -> List[int]:
+    """
+    Sorted page indices to profile: every page for short documents, otherwise exactly SAMPLE_PAGES pages -
+    a fixed stride (first, quarters, last) topped up from a generator seeded by the page count,
+    so the same document always gets the same sample (and the same routing).
+    """
+    if n_pages <= SAMPLE_PAGES:
+        return list(range(n_pages))
+    picked = {0, n_pages // 4, n_pages // 2, 3 * n_pages // 4, n_pages - 1}
+    rest = [i for i in range(n_pages) if i not in picked]
+    picked.update(random.Random(n_pages).sample(rest, SAMPLE_PAGES - len(picked)))
+    return sorted(picked)
+
+
+def _iter_page_stats(doc, indices: Iterable[int], page_chars: Dict[int, int]) -> Iterator[PdfPageStats]:
+    """
+    Yields PdfPageStats for the given page indices, loading each page only when the next stat is requested.
+    page_chars maps page index -> non-whitespace char count from the pre-check pass;
+    pages it doesn't cover are counted here.
+    """
+    for idx in indices:
+        pg = doc[idx]
+        W, H = float(pg.rect.width), float(pg.rect.height)
+        page_area = max(W * H, 1.0)
+
+        # ----- image area ratio -----
+        imgs = pg.get_image_info() or []
+        img_area = _sum_bbox_areas(map(_IMAGE_BBOX, imgs), len(imgs))
+        image_area_ratio = min(img_area / page_area, 1.0)
+
+        # ----- text density -----
+        # word tuples: (x0, y0, x1, y1, word, block_no, line_no, word_no)
+        try:
+            words = pg.get_text("words") or []
+        except Exception:
+            words = []
+
+        # non-whitespace char count (already read by the pre-check)
+        text_chars = page_chars[idx] if idx in page_chars else sum(map(len, pg.get_text().split()))
+
+        # word boxes (sum area to approximate text coverage)
+        word_area = _sum_bbox_areas(map(_WORD_BBOX, words), len(words))
+        text_area_ratio = min(word_area / page_area, 1.0)
+
+        has_images = image_area_ratio > 0.0
+        has_text = (text_chars >= CHAR_MIN_FOR_TEXT) or (text_area_ratio >= TEXT_AREA_MIN_RATIO)
+
+        image_dominant = image_area_ratio >= IMG_RATIO_SCANNED
+        text_dominant = (text_area_ratio >= TEXT_AREA_MIN_RATIO and not image_dominant)
+
+        yield PdfPageStats(
+            index=idx,
+            width=W,
+            height=H,
+            image_area_ratio=image_area_ratio,
+            text_chars=text_chars,
+            text_words=len(words),
+            text_area_ratio=text_area_ratio,
+            has_text=has_text,
+            has_images=has_images,
+            image_dominant=image_dominant,
+            text_dominant=text_dominant,
+        )
+
+
+def _render_pages(doc, profile: PdfLayoutProfile, indices: List[int]) -> None:
+    """
+    Fills profile.rendered_pages with PNG renders of the given pages at RENDER_ZOOM, up to
+    RENDER_PAGE_LIMIT pages; the pages past the limit go to profile.unrendered_pages.
+    Runs sequentially: PyMuPDF documents must not be shared across threads, so parallelism
+    comes from the per-document worker processes instead.
+    """
+    matrix = pymupdf.Matrix(RENDER_ZOOM, RENDER_ZOOM)
+    profile.rendered_pages = {
+        idx: doc[idx].get_pixmap(matrix=matrix, alpha=False).tobytes("png") for idx in indices[:RENDER_PAGE_LIMIT]
+    }
+    profile.unrendered_pages = indices[RENDER_PAGE_LIMIT:]
+
+
+def _apply_page_counts(profile: PdfLayoutProfile, img_scanned: int, txt_scanned: int,
+                       scanned: int, target: int) -> None:
+    """
+    Sets the page aggregates, recommendation and rationale from the dominance counts over
+    `scanned` pages, out of `target` pages meant to be scanned.
+    """
+    n_pages = profile.pages
+
+    # Extrapolate scanned pages to the whole document (no-op for a full scan)
+    profile.counts_partial = scanned < target
+    scale = n_pages / scanned if scanned else 0.0
+    img_dom = round(img_scanned * scale)
+    txt_dom = round(txt_scanned * scale)
+    mixed = n_pages - (img_dom + txt_dom)
+
+    profile.pages_image_dominant = img_dom
+    profile.pages_text_dominant = txt_dom
+    profile.pages_mixed = mixed
+
+    # Recommend pipeline:
+    # - If most pages are image-dominant -> OCR
+    # - If most pages are text-dominant  -> pdfplumber
+    # - Otherwise                        -> hybrid (OCR image-dominant pages; parse text pages)
+    if scanned > 0:
+        frac_img = img_scanned / scanned
+        frac_txt = txt_scanned / scanned
+
+        if frac_img >= OCR_PAGE_FRACTION:
+            profile.recommended = "ocr"
+            profile.rationale = f"{img_dom}/{n_pages} pages are image-dominant (≥{int(IMG_RATIO_SCANNED * 100)}% image area)."
+        elif frac_txt >= TEXT_PAGE_FRACTION:
+            profile.recommended = "pdfplumber"
+            profile.rationale = f"{txt_dom}/{n_pages} pages have sufficient text density."
+        else:
+            profile.recommended = "hybrid"
+            profile.rationale = (
+                f"Mixed content: image-dominant={img_dom}, text-dominant={txt_dom}, mixed={mixed}."
+            )
+
+        if profile.counts_partial:
+            profile.rationale += (
+                f" Counts partial: scan stopped after {scanned} of {target} sampled pages ({n_pages} total)."
+            )
+        elif scanned < n_pages:
+            profile.rationale += f" Estimated from {scanned}/{n_pages} sampled pages."
+
+    # Extra hint: if Producer indicates scanner, bias toward OCR if not already
+    # (PyMuPDF metadata keys are lowercase)
+    producer = (profile.metadata.get("producer") or "").lower()
+    if "scan" in producer and profile.recommended == "pdfplumber":
+        profile.recommended = "hybrid"
+        profile.rationale += " Producer suggests a scanner; using hybrid for safety."
+
+
+def _profile_pdf_layout(path: Optional[str], original_name: Optional[str] = None,
+                        exhaustive: bool = False, data: Optional[bytes] = None,
+                        keep_page_stats: bool = False, render_pages: bool = False) -> PdfLayoutProfile:
+    """
+    Classifies a PDF by page:
+      - image_area_ratio (0..1)
+      - text density (chars, words, text_area_ratio)
+    And recommends: 'ocr' | 'pdfplumber' | 'hybrid'
+
+    PDFs averaging fewer than CHAR_MIN_FOR_TEXT extractable non-whitespace chars per page are
+    recommended for OCR straight away, without the per-page layout scan.
+
+    Unless exhaustive=True, only SAMPLE_PAGES pages (see _sample_page_indices) go
+    through the pre-check and the scan, and the scan stops as soon as the remaining
+    pages can no longer change the recommendation; page aggregates are extrapolated
+    to the whole document from the pages scanned (counts_partial=True when that was
+    only a prefix of the sample).
+
+    The PDF is read from `path`, or from in-memory `data` when path is None.
+
+    Relies on PyMuPDF (only aggregate areas/counts are needed, so no pdfplumber
+    char/word materialization). Returns PdfLayoutProfile; per-page stats are
+    streamed through the aggregates and only kept when keep_page_stats=True; a
+    'hybrid' result then scans the pages the sample skipped, so page_stats covers
+    every page for per-page routing (and the aggregates become exact counts).
+
+    render_pages=True also renders the OCR-bound pages while the document is
+    open: every page for 'ocr', every image-dominant page for 'hybrid' (a sampled
+    hybrid scan is completed over the remaining pages to find them). At most
+    RENDER_PAGE_LIMIT pages are rendered; see PdfLayoutProfile.unrendered_pages.
+    """
+    name = original_name or (os.path.basename(path) if path else None)
+    if not path and data is None:
+        return PdfLayoutProfile(file_name=name, readable=False, pages=0, error="no input provided")
+
+    try:
+        with (pymupdf.open(path) if path else pymupdf.open(stream=data, filetype="pdf")) as doc:
+            meta = doc.metadata or {}
+            n_pages = doc.page_count
+            profile = PdfLayoutProfile(file_name=name, readable=True, pages=n_pages, metadata=meta)
+
+            indices = range(n_pages) if exhaustive else _sample_page_indices(n_pages)
+
+            # ----- cheap pre-check: scanned PDFs have (almost) no text layer -----
+            # Only the text layer of the pages to be scanned is read here; image/word geometry
+            # is skipped entirely and page_stats stays empty when this short-circuits.
+            # Whitespace is left out so layout padding doesn't pass for text; per-page counts are
+            # kept and reused as text_chars below.
+            page_chars = {idx: sum(map(len, doc[idx].get_text().split())) for idx in indices}
+            if page_chars:
+                avg_chars = sum(page_chars.values()) / len(page_chars)
+                if avg_chars < CHAR_MIN_FOR_TEXT:
+                    profile.recommended = "ocr"
+                    profile.rationale = (
+                        f"Avg {avg_chars:.0f} extractable chars/page (<{CHAR_MIN_FOR_TEXT}); treated as scanned."
+                    )
+                    if render_pages:
+                        _render_pages(doc, profile, list(range(n_pages)))
+                    return profile
+
+            target = len(indices)
+            scanned = img_scanned = txt_scanned = 0
+            image_pages = []
+
+            for stats in _iter_page_stats(doc, indices, page_chars):
+                scanned += 1
+                if keep_page_stats:
+                    profile.page_stats.append(stats)
+                img_scanned += stats.image_dominant
+                txt_scanned += stats.text_dominant
+                if stats.image_dominant:
+                    image_pages.append(stats.index)
+
+                # ----- early exit once the recommendation is settled -----
+                if not exhaustive:
+                    remaining = target - scanned
+                    ocr_settled = img_scanned >= OCR_PAGE_FRACTION * target
+                    ocr_ruled_out = img_scanned + remaining < OCR_PAGE_FRACTION * target
+                    text_settled = (txt_scanned >= TEXT_PAGE_FRACTION * target
+                                    or txt_scanned + remaining < TEXT_PAGE_FRACTION * target)
+                    if ocr_settled or (ocr_ruled_out and text_settled):
+                        break
+
+            _apply_page_counts(profile, img_scanned, txt_scanned, scanned, target)
+
+            # ----- hybrid routing is per page: the sample only names some of them -----
+            # Scan the pages not covered yet so page_stats / renders cover the whole document
+            if profile.recommended == "hybrid" and (keep_page_stats or render_pages) and scanned < n_pages:
+                seen = set(indices[:scanned])
+                for stats in _iter_page_stats(doc, [i for i in range(n_pages) if i not in seen], page_chars):
+                    scanned += 1
+                    if keep_page_stats:
+                        profile.page_stats.append(stats)
+                    img_scanned += stats.image_dominant
+                    txt_scanned += stats.text_dominant
+                    if stats.image_dominant:
+                        image_pages.append(stats.index)
+                image_pages.sort()
+                profile.page_stats.sort(key=lambda st: st.index)
+
+                # Every page has been looked at now: exact counts replace the sample's estimate
+                _apply_page_counts(profile, img_scanned, txt_scanned, scanned, scanned)
+
+            if render_pages:
+                if profile.recommended == "ocr":
+                    _render_pages(doc, profile, list(range(n_pages)))
+                elif profile.recommended == "hybrid":
+                    _render_pages(doc, profile, image_pages)
+
+            return profile
+
+    except Exception as e:
+        return PdfLayoutProfile(file_name=name, readable=False, pages=0, error=str(e))
 
 # ---------- Example usage ----------
 if __name__ == '__main__':
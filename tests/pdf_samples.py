@@ -0,0 +1,16 @@
+import pymupdf
+
+
+def make_pdf(layout: str) -> bytes:
+    """PDF bytes with one page per char of `layout`: 't' a full text page, 'i' a full-page image."""
+    pix = pymupdf.Pixmap(pymupdf.csRGB, pymupdf.IRect(0, 0, 50, 70), False)
+    pix.clear_with(200)
+    doc = pymupdf.open()
+    for kind in layout:
+        page = doc.new_page()
+        if kind == "t":
+            page.insert_textbox(pymupdf.Rect(50, 50, 550, 800), "Lorem ipsum dolor sit amet consectetur " * 80,
+                                fontsize=11)
+        else:
+            page.insert_image(page.rect, pixmap=pix)
+    return doc.tobytes()
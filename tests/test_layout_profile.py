@@ -0,0 +1,91 @@
+import pytest
+
+import ocr_system.main as ocr_main
+from ocr_system.main import SAMPLE_PAGES, _profile_pdf_layout, _sample_page_indices
+from pdf_samples import make_pdf
+
+ALTERNATING = "ti" * 20
+
+
+@pytest.mark.parametrize("n_pages", [0, 1, SAMPLE_PAGES])
+def test_short_documents_are_scanned_in_full(n_pages):
+    assert _sample_page_indices(n_pages) == list(range(n_pages))
+
+
+@pytest.mark.parametrize("n_pages", [SAMPLE_PAGES + 1, 40, 1001])
+def test_sample_is_deterministic_stride_plus_fill(n_pages):
+    indices = _sample_page_indices(n_pages)
+
+    assert indices == _sample_page_indices(n_pages)
+    assert indices == sorted(set(indices))
+    assert len(indices) == SAMPLE_PAGES
+    assert {0, n_pages // 4, n_pages // 2, 3 * n_pages // 4, n_pages - 1} <= set(indices)
+    assert all(0 <= i < n_pages for i in indices)
+
+
+def test_early_exit_marks_counts_partial():
+    profile = _profile_pdf_layout(None, "alt.pdf", data=make_pdf(ALTERNATING))
+
+    assert profile.recommended == "hybrid"
+    assert profile.counts_partial
+    assert "Counts partial" in profile.rationale
+
+
+def test_hybrid_page_stats_cover_every_page():
+    profile = _profile_pdf_layout(None, "alt.pdf", data=make_pdf(ALTERNATING), keep_page_stats=True)
+
+    assert profile.recommended == "hybrid"
+    assert [s.index for s in profile.page_stats] == list(range(40))
+    assert [s.index for s in profile.page_stats if s.image_dominant] == list(range(1, 40, 2))
+    assert [s.index for s in profile.page_stats if s.text_dominant] == list(range(0, 40, 2))
+    # The completed scan replaces the sample's estimate
+    assert not profile.counts_partial
+    assert (profile.pages_image_dominant, profile.pages_text_dominant, profile.pages_mixed) == (20, 20, 0)
+    assert "sampled" not in profile.rationale
+
+
+def test_full_sample_is_not_partial():
+    profile = _profile_pdf_layout(None, "text.pdf", data=make_pdf("t" * 20), keep_page_stats=True)
+
+    assert profile.recommended == "pdfplumber"
+    assert not profile.counts_partial
+    assert [s.index for s in profile.page_stats] == _sample_page_indices(20)
+    assert profile.pages_text_dominant == 20
+    assert f"Estimated from {SAMPLE_PAGES}/20 sampled pages." in profile.rationale
+
+
+def test_profile_is_repeatable():
+    data = make_pdf(ALTERNATING)
+    first = _profile_pdf_layout(None, "alt.pdf", data=data)
+    second = _profile_pdf_layout(None, "alt.pdf", data=data)
+
+    assert (first.recommended, first.rationale) == (second.recommended, second.rationale)
+
+
+def test_exhaustive_scans_every_page():
+    profile = _profile_pdf_layout(None, "alt.pdf", data=make_pdf(ALTERNATING), exhaustive=True, keep_page_stats=True)
+
+    assert profile.recommended == "hybrid"
+    assert not profile.counts_partial
+    assert [s.index for s in profile.page_stats] == list(range(40))
+    assert (profile.pages_image_dominant, profile.pages_text_dominant, profile.pages_mixed) == (20, 20, 0)
+    assert "sampled" not in profile.rationale
+
+
+def test_hybrid_renders_every_image_page():
+    profile = _profile_pdf_layout(None, "alt.pdf", data=make_pdf(ALTERNATING), render_pages=True)
+
+    assert profile.recommended == "hybrid"
+    assert sorted(profile.rendered_pages) == list(range(1, 40, 2))
+    assert profile.pages_image_dominant == 20
+    assert not profile.unrendered_pages
+
+
+def test_renders_are_capped(monkeypatch):
+    monkeypatch.setattr(ocr_main, "RENDER_PAGE_LIMIT", 3)
+    profile = _profile_pdf_layout(None, "scan.pdf", data=make_pdf("i" * 5), render_pages=True)
+
+    assert profile.recommended == "ocr"
+    assert sorted(profile.rendered_pages) == [0, 1, 2]
+    assert profile.unrendered_pages == [3, 4]
+    assert all(png.startswith(b"\x89PNG") for png in profile.rendered_pages.values())
@@ -0,0 +1,147 @@
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import ocr_system.main as ocr_main
+from ocr_system.main import TextExtractor
+from pdf_samples import make_pdf
+
+
+def _text_pdf(pages=3):
+    return make_pdf("t" * pages)
+
+
+def _scan_pdf(pages=2):
+    return make_pdf("i" * pages)
+
+
+def _make_zip(path, members):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as zf:
+        for name, data in members:
+            zf.writestr(name, data)
+    return str(path)
+
+
+@pytest.fixture
+def submitted(monkeypatch):
+    """Runs profiling in-process and records the member names handed to workers."""
+    names = []
+
+    class CountingExecutor(ThreadPoolExecutor):
+        def __init__(self, max_workers=None):
+            super().__init__(max_workers=1)  # PyMuPDF is not thread-safe
+
+        def submit(self, fn, member, *args):
+            names.append(member.name)
+            return super().submit(fn, member, *args)
+
+    monkeypatch.setattr(ocr_main, "ProcessPoolExecutor", CountingExecutor)
+    return names
+
+
+def _profile(api, zip_path, verify_crc=True):
+    zd = ocr_main.ZipData()
+    try:
+        return {p.file_name: p for p in api._profile_members(api.iter_zip_members(zip_path, zd, verify_crc))}
+    finally:
+        api.cleanup_zip_members(zd)
+
+
+def test_duplicates_in_one_archive_are_profiled_once(tmp_path, submitted):
+    pdf = _text_pdf()
+    zip_path = _make_zip(tmp_path / "a.zip", [("one.pdf", pdf), ("two.pdf", pdf)])
+
+    profiles = _profile(TextExtractor(), zip_path)
+
+    assert submitted == ["one.pdf"]
+    assert set(profiles) == {"one.pdf", "two.pdf"}
+    assert profiles["two.pdf"].recommended == profiles["one.pdf"].recommended == "pdfplumber"
+
+
+def test_cache_hit_across_archives(tmp_path, submitted):
+    pdf = _text_pdf()
+    api = TextExtractor()
+
+    _profile(api, _make_zip(tmp_path / "a.zip", [("a.pdf", pdf)]))
+    profiles = _profile(api, _make_zip(tmp_path / "b.zip", [("b.pdf", pdf), ("other.pdf", _text_pdf(pages=1))]))
+
+    assert submitted == ["a.pdf", "other.pdf"]
+    assert profiles["b.pdf"].file_name == "b.pdf"
+    assert profiles["b.pdf"].readable
+
+
+def test_cached_profiles_are_independent_copies(tmp_path, submitted):
+    pdf = _text_pdf()
+    api = TextExtractor(keep_page_stats=True)
+
+    first = _profile(api, _make_zip(tmp_path / "a.zip", [("a.pdf", pdf)]))["a.pdf"]
+    first.metadata["producer"] = "changed"
+    first.page_stats.clear()
+
+    second = _profile(api, _make_zip(tmp_path / "b.zip", [("b.pdf", pdf)]))["b.pdf"]
+    assert submitted == ["a.pdf"]
+    assert second.metadata.get("producer") != "changed"
+    assert len(second.page_stats) == 3
+
+    second.page_stats[0].text_chars = -1
+    third = _profile(api, _make_zip(tmp_path / "c.zip", [("c.pdf", pdf)]))["c.pdf"]
+    assert third.page_stats[0].text_chars > 0
+
+
+def test_unreadable_profiles_are_not_cached(tmp_path, submitted):
+    junk = b"not a pdf" * 100
+    api = TextExtractor()
+
+    first = _profile(api, _make_zip(tmp_path / "a.zip", [("a.pdf", junk)]))["a.pdf"]
+    second = _profile(api, _make_zip(tmp_path / "b.zip", [("b.pdf", junk)]))["b.pdf"]
+
+    assert not first.readable and not second.readable
+    assert submitted == ["a.pdf", "b.pdf"]
+    assert not api._profile_cache
+
+
+def test_corrupt_unverified_member_is_not_served_from_cache(tmp_path, submitted):
+    pdf = _text_pdf()
+    api = TextExtractor()
+    _profile(api, _make_zip(tmp_path / "good.zip", [("doc.pdf", pdf)]))
+
+    # Same central-directory CRC and size, damaged bytes
+    bad_path = _make_zip(tmp_path / "bad.zip", [("doc.pdf", pdf)])
+    raw = bytearray((tmp_path / "bad.zip").read_bytes())
+    offset = raw.index(pdf) + len(pdf) // 2
+    raw[offset] ^= 0xFF
+    (tmp_path / "bad.zip").write_bytes(bytes(raw))
+
+    profile = _profile(api, bad_path, verify_crc=False)["doc.pdf"]
+
+    assert submitted == ["doc.pdf", "doc.pdf"]
+    assert not profile.readable
+    assert "CRC" in profile.error
+
+
+def test_cache_is_bounded(tmp_path, submitted, monkeypatch):
+    monkeypatch.setattr(ocr_main, "PROFILE_CACHE_SIZE", 2)
+    pdfs = [_text_pdf(pages=n) for n in (1, 2, 3)]
+    api = TextExtractor()
+
+    _profile(api, _make_zip(tmp_path / "a.zip", [(f"{i}.pdf", pdf) for i, pdf in enumerate(pdfs)]))
+    assert len(api._profile_cache) == 2
+
+    # Oldest entry was evicted and is profiled again
+    _profile(api, _make_zip(tmp_path / "b.zip", [("again.pdf", pdfs[0])]))
+    assert submitted[-1] == "again.pdf"
+    assert len(api._profile_cache) == 2
+
+
+def test_renders_are_not_cached(tmp_path, submitted):
+    pdf = _scan_pdf()
+    api = TextExtractor(render_pages=True)
+
+    first = _profile(api, _make_zip(tmp_path / "a.zip", [("a.pdf", pdf)]))["a.pdf"]
+    second = _profile(api, _make_zip(tmp_path / "b.zip", [("b.pdf", pdf)]))["b.pdf"]
+
+    assert first.recommended == second.recommended == "ocr"
+    assert len(first.rendered_pages) == len(second.rendered_pages) == 2
+    assert submitted == ["a.pdf", "b.pdf"]
+    assert all(not p.rendered_pages for p in api._profile_cache.values())
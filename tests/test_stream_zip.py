@@ -0,0 +1,157 @@
+import shutil
+import subprocess
+import zipfile
+
+import pytest
+
+from ocr_system.main import TextExtractor
+from pdf_samples import make_pdf
+
+pytest.importorskip("stream_unzip")
+
+needs_zip_cli = pytest.mark.skipif(shutil.which("zip") is None, reason="encrypted archives are built with `zip -P`")
+
+PDF = make_pdf("tt")
+
+
+class _Unseekable:
+    """Write-only sink: zipfile then writes sizes/CRCs to data descriptors after each member."""
+
+    def __init__(self, path):
+        self._fh = open(path, "wb")
+
+    def write(self, data):
+        return self._fh.write(data)
+
+    def flush(self):
+        self._fh.flush()
+
+    def close(self):
+        self._fh.close()
+
+
+def _encrypted_zip(tmp_path, names, password="secret"):
+    for name in names:
+        (tmp_path / name).write_bytes(PDF if name.endswith(".pdf") else b"notes")
+    subprocess.run(["zip", "-q", "-P", password, "enc.zip", *names], cwd=tmp_path, check=True)
+    return str(tmp_path / "enc.zip")
+
+
+def _members(zip_path, stream_zip=True, password=None, **kwargs):
+    api = TextExtractor(stream_zip=stream_zip, **kwargs)
+    if password:
+        api.set_zip_password(password)
+    return api, api.get_zip_members(zip_path)
+
+
+def test_streamed_members_match_zipfile_backend(tmp_path):
+    zip_path = tmp_path / "a.zip"
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("dir/", b"")
+        zf.writestr("a.pdf", PDF)
+        zf.writestr("notes.txt", b"notes")
+        zf.writestr("b.PDF", PDF)
+
+    api, streamed = _members(str(zip_path))
+    _, listed = _members(str(zip_path), stream_zip=False)
+
+    assert streamed.ok_files == listed.ok_files == ["a.pdf", "b.PDF"]
+    assert all(m.crc_ok and m.size == len(PDF) for m in streamed.ok_members)
+    assert [api.read_member(m) for m in streamed.ok_members] == [PDF, PDF]
+
+
+def test_data_descriptor_members(tmp_path):
+    sink = _Unseekable(tmp_path / "dd.zip")
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("a.pdf", PDF)
+        zf.writestr("b.pdf", PDF[::-1])
+    sink.close()
+
+    api, zd = _members(str(tmp_path / "dd.zip"))
+    try:
+        assert zd.ok_files == ["a.pdf", "b.pdf"]
+        assert not zd.errors
+        # Size unknown up front, so the member goes to a temp file even in memory mode
+        assert all(m.temp_path and m.data is None for m in zd.ok_members)
+        assert [m.size for m in zd.ok_members] == [len(PDF)] * 2
+        assert [m.crc for m in zd.ok_members] == [zipfile.crc32(PDF), zipfile.crc32(PDF[::-1])]
+        assert api.read_member(zd.ok_members[0]) == PDF
+    finally:
+        api.cleanup_zip_members(zd)
+
+
+def test_corrupt_member_is_reported_and_ends_the_walk(tmp_path):
+    zip_path = tmp_path / "bad.zip"
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_STORED) as zf:
+        zf.writestr("ok.pdf", make_pdf("t"))
+        zf.writestr("bad.pdf", PDF)
+        zf.writestr("after.pdf", PDF)
+    raw = bytearray(zip_path.read_bytes())
+    raw[raw.index(PDF) + len(PDF) // 2] ^= 0xFF
+    zip_path.write_bytes(bytes(raw))
+
+    _, zd = _members(str(zip_path))
+
+    assert zd.ok_files == ["ok.pdf"]
+    assert zd.bad_files == ["bad.pdf"]
+    assert zd.bad_members[0].error == "CRC32IntegrityError"
+
+
+def test_truncated_archive(tmp_path):
+    zip_path = tmp_path / "cut.zip"
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("a.pdf", PDF)
+    zip_path.write_bytes(zip_path.read_bytes()[:100])
+
+    _, zd = _members(str(zip_path))
+
+    assert not zd.ok_files
+    assert len(zd.errors) == 1
+
+
+@needs_zip_cli
+@pytest.mark.parametrize("password", [None, "wrong"])
+def test_bad_password_reports_member_by_name(tmp_path, password):
+    zip_path = _encrypted_zip(tmp_path, ["p1.pdf", "n.txt"])
+
+    _, zd = _members(zip_path, password=password)
+
+    assert zd.bad_files == ["p1.pdf"]
+    assert zd.errors == ["p1.pdf: Encrypted entry (wrong/missing password)."]
+
+
+@needs_zip_cli
+@pytest.mark.parametrize("password", [None, "wrong"])
+def test_bad_password_on_skipped_entry_is_not_a_bad_member(tmp_path, password):
+    zip_path = _encrypted_zip(tmp_path, ["n.txt", "p1.pdf", "p2.pdf"])
+
+    _, zd = _members(zip_path, password=password)
+
+    assert not zd.ok_files and not zd.bad_files
+    assert zd.errors == ["n.txt: Encrypted entry (wrong/missing password). Stopped reading the archive."]
+
+
+@needs_zip_cli
+def test_correct_password(tmp_path):
+    zip_path = _encrypted_zip(tmp_path, ["n.txt", "p1.pdf", "p2.pdf"])
+
+    api, zd = _members(zip_path, password="secret")
+
+    assert zd.ok_files == ["p1.pdf", "p2.pdf"]
+    assert not zd.errors
+    assert api.read_member(zd.ok_members[0]) == PDF
+
+
+def test_verify_crc_false_is_reported(tmp_path):
+    zip_path = tmp_path / "a.zip"
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        zf.writestr("a.pdf", PDF)
+
+    api = TextExtractor(stream_zip=True)
+
+    assert api.get_zip_members(str(zip_path), verify_crc=False).errors == [
+        "verify_crc=False is not supported with stream_zip=True."
+    ]
+    assert api.extract(str(zip_path), verify_crc=False).error == [
+        "verify_crc=False is not supported with stream_zip=True."
+    ]